@@ -0,0 +1,169 @@
+import itertools
+import numpy as np
+
+CUTTOF_VAL =.00001
+
+'''
+	Precision modes of the batched solver
+'''
+PRECISIONS = {
+	"float64": np.float64,
+	"float32": np.float32,
+}
+
+'''
+	Rounding uncertainty of a residual in ulps of the problem scale.
+	Rows with a residual this close to CUTTOF_VAL can not be decided
+	in lower precision and are re-solved in float64.
+'''
+UNCERTAINTY_ULPS = 64
+
+'''
+	Rows whose relative conditioning (baseline length or discriminant
+	over the problem scale) falls below this value are re-solved in
+	float64 when a lower precision is selected.
+'''
+ILL_CONDITIONED = 1e-4
+
+'''
+	Intersection points of M pairs of circles.
+	centers - (M, 2, 2) array, radii - (M, 2) array
+	Returns points (M, 2, 2), valid mask (M,) and the relative
+	conditioning (M,) of every pair.
+'''
+def circle_intersections(centers, radii):
+	p0, p1 = centers[:, 0], centers[:, 1]
+	r0, r1 = radii[:, 0], radii[:, 1]
+	delta = p1 - p0
+	d = np.linalg.norm(delta, axis=1)
+	scale = np.maximum(np.maximum(r0, r1), d)
+	valid = d > 0
+	d = np.where(valid, d, 1)
+
+	a = (r0**2 - r1**2 + d**2) / (2 * d)
+	h2 = r0**2 - a**2
+	valid &= h2 >= 0
+	h = np.sqrt(np.maximum(h2, 0))
+	mid = p0 + (a / d)[:, None] * delta
+	perp = np.stack([delta[:, 1], -delta[:, 0]], axis=1) / d[:, None]
+	points = np.stack([mid + h[:, None] * perp, mid - h[:, None] * perp], axis=1)
+
+	conditioning = np.minimum(d / scale, np.abs(h2) / scale**2)
+	return points, valid, conditioning
+
+'''
+	Intersection points of M triples of spheres, solved in closed form
+	in the frame spanned by the three centers.
+	centers - (M, 3, 3) array, radii - (M, 3) array
+	Returns points (M, 2, 3), valid mask (M,) and the relative
+	conditioning (M,) of every triple.
+'''
+def sphere_intersections(centers, radii):
+	p1, p2, p3 = centers[:, 0], centers[:, 1], centers[:, 2]
+	r1, r2, r3 = radii[:, 0], radii[:, 1], radii[:, 2]
+	e = p2 - p1
+	d = np.linalg.norm(e, axis=1)
+	valid = d > 0
+	d = np.where(valid, d, 1)
+	ex = e / d[:, None]
+
+	q = p3 - p1
+	i = np.sum(ex * q, axis=1)
+	t = q - i[:, None] * ex
+	j = np.linalg.norm(t, axis=1)
+	valid &= j > 0
+	j = np.where(j > 0, j, 1)
+	ey = t / j[:, None]
+	ez = np.cross(ex, ey)
+
+	x = (r1**2 - r2**2 + d**2) / (2 * d)
+	y = (r1**2 - r3**2 + i**2 + j**2) / (2 * j) - i * x / j
+	z2 = r1**2 - x**2 - y**2
+	valid &= z2 >= 0
+	z = np.sqrt(np.maximum(z2, 0))
+	base = p1 + x[:, None] * ex + y[:, None] * ey
+	points = np.stack([base + z[:, None] * ez, base - z[:, None] * ez], axis=1)
+
+	scale = np.maximum(np.max(radii, axis=1), np.maximum(d, np.linalg.norm(q, axis=1)))
+	conditioning = np.minimum(np.minimum(d, j) / scale, np.abs(z2) / scale**2)
+	return points, valid, conditioning
+
+'''
+	Intersection kernel per dimension. A kernel takes d shapes of
+	dimension d and returns their (up to) two intersection points.
+'''
+KERNELS = {
+	2: circle_intersections,
+	3: sphere_intersections,
+}
+
+'''
+	Rounding uncertainty of residuals for problems of the given scale
+'''
+def uncertainty(dtype, scale):
+	return (UNCERTAINTY_ULPS * np.finfo(dtype).eps * scale).astype(dtype)
+
+'''
+	Candidates of a d-subset lie on its d shapes by construction, so
+	only the residual to the remaining shape decides the in/on checks.
+'''
+def _trilaterate(centers, radii, dtype):
+	M, k, d = centers.shape
+	kernel = KERNELS[d]
+	points = []
+	residuals = []
+	valid = np.ones(M, dtype=bool)
+	conditioning = np.full(M, np.inf, dtype=dtype)
+	for subset in itertools.combinations(range(k), d):
+		rest = [i for i in range(k) if i not in subset][0]
+		pts, ok, cond = kernel(centers[:, list(subset)], radii[:, list(subset)])
+		points.append(pts)
+		residuals.append(np.linalg.norm(pts - centers[:, None, rest], axis=2) - radii[:, None, rest])
+		valid &= ok
+		conditioning = np.minimum(conditioning, cond)
+
+	points = np.concatenate(points, axis=1)
+	residuals = np.concatenate(residuals, axis=1)
+	inside = (residuals <= CUTTOF_VAL) & valid[:, None]
+	on = inside & (np.abs(residuals) <= CUTTOF_VAL)
+	band = uncertainty(dtype, np.max(radii, axis=1))
+	uncertain = np.any(np.abs(residuals) <= CUTTOF_VAL + band[:, None], axis=1) & valid
+
+	count = np.sum(inside, axis=1)
+	localized = count > 0
+	centroid = np.sum(points * inside[:, :, None], axis=1) / np.maximum(count, 1)[:, None]
+	has_on = np.any(on, axis=1)
+	first = points[np.arange(M), np.argmax(on, axis=1)]
+	estimates = np.where(has_on[:, None], first, centroid)
+	return estimates, localized, uncertain | (conditioning < ILL_CONDITIONED)
+
+'''
+	Trilaterates M sensors at once with the same rules as
+	trilaterate_with_noise: candidate points are the intersections of
+	every d-subset of the k = d + 1 shapes, the first candidate on all
+	shapes wins, otherwise the centroid of candidates inside all shapes.
+	centers - (M, k, d) array of ancor locations
+	radii - (M, k) array of measured ranges
+	[precision] is one of PRECISIONS. Geometry is solved relative to the
+	first center of each row so float32 only has to resolve distances
+	of the order of R, not L. Ill-conditioned rows (near tangent or
+	collinear ancors) and rows whose in/on checks fall within the
+	rounding uncertainty of CUTTOF_VAL are re-solved in float64.
+	Returns estimates (M, d), localized mask (M,) and residuals (M, k)
+	of the estimates, all in float64.
+'''
+def trilaterate_batch(centers, radii, precision = "float64"):
+	dtype = PRECISIONS[precision]
+	centers = np.asarray(centers, dtype=np.float64)
+	radii = np.asarray(radii, dtype=np.float64)
+	origin = centers[:, 0, :]
+	local = centers - origin[:, None, :]
+
+	with np.errstate(invalid="ignore", divide="ignore"):
+		estimates, localized, refine = _trilaterate(local.astype(dtype), radii.astype(dtype), dtype)
+		estimates = estimates.astype(np.float64)
+		if dtype != np.float64 and np.any(refine):
+			estimates[refine], localized[refine], _ = _trilaterate(local[refine], radii[refine], np.float64)
+
+	residuals = np.linalg.norm(estimates[:, None, :] - local, axis=2) - radii
+	return estimates + origin, localized, residuals
@@ -0,0 +1,98 @@
+import time
+import numpy as np
+import trillateration_2D
+import trillateration_3D
+import field_generator
+import localization_core
+from batched_trilateration import trilaterate_batch, PRECISIONS
+from measurements import simulate_ranges
+
+np.random.seed(42)
+
+L = 200
+R = 100
+Ferr = 0.1
+M = 200000
+SCALAR_SAMPLES = 2000
+FIELD_L = {2: 2000, 3: 400}
+FIELD_N = 200000
+FIELD_R = 20
+FIELD_Fa = 0.2
+
+'''
+	Builds M random trilateration problems: a true location and
+	d + 1 ancors in its range with noisy ranges, as add_noise does.
+'''
+def generate_problems(M, d, L, R, Ferr):
+	truth = L * np.random.rand(M, d)
+	directions = np.random.normal(size=(M, d + 1, d))
+	directions /= np.linalg.norm(directions, axis=2, keepdims=True)
+	centers = truth[:, None, :] + R * np.random.rand(M, d + 1, 1) * directions
+	ranges = np.linalg.norm(centers - truth[:, None, :], axis=2)
+
+	noise = np.random.normal(0.0, 0.3, size=ranges.shape)
+	outside = np.abs(noise) > 1
+	while np.any(outside):
+		noise[outside] = np.random.normal(0.0, 0.3, size=np.count_nonzero(outside))
+		outside = np.abs(noise) > 1
+
+	noisy = ranges + Ferr * R * noise
+	ranges = np.where(noisy < 0, ranges, noisy)
+	return truth, centers, ranges
+
+def scalar_solve(module, shape, point, centers, ranges):
+	shapes = [shape(point(*c), r) for c, r in zip(centers, ranges)]
+	result = module.trilaterate_with_noise(*shapes)
+	return result.as_numpy() if result else None
+
+def run(d, module, shape, point):
+	truth, centers, ranges = generate_problems(M, d, L, R, Ferr)
+	print(f"{d}D, {M} sensors, L={L} R={R} Ferr={Ferr}")
+
+	start = time.perf_counter()
+	for i in range(SCALAR_SAMPLES):
+		scalar_solve(module, shape, point, centers[i], ranges[i])
+	elapsed = (time.perf_counter() - start) / SCALAR_SAMPLES * M
+	print(f"\tscalar    {elapsed:8.3f}s (extrapolated from {SCALAR_SAMPLES})")
+
+	results = {}
+	for precision in PRECISIONS:
+		start = time.perf_counter()
+		estimates, localized, _ = trilaterate_batch(centers, ranges, precision)
+		elapsed = time.perf_counter() - start
+		results[precision] = estimates, localized
+		ale = np.average(np.linalg.norm(estimates[localized] - truth[localized], axis=1))
+		print(f"\t{precision:9} {elapsed:8.3f}s localized {np.mean(localized) * 100:6.2f}% ALE {ale:.4f}")
+
+	reference, reference_localized = results["float64"]
+	for precision, (estimates, localized) in results.items():
+		if precision == "float64":
+			continue
+
+		both = localized & reference_localized
+		diff = np.linalg.norm(estimates[both] - reference[both], axis=1)
+		agreement = np.mean(localized == reference_localized) * 100
+		print(f"\t{precision} vs float64: agreement {agreement:.3f}% mean diff {np.mean(diff):.2e} max diff {np.max(diff):.2e}")
+
+'''
+	Times the simulation stage and the solve on its range table
+	separately, the solve is the path real measurements take.
+'''
+def run_field(d):
+	positions, radii, is_ancor = field_generator.generate_field(FIELD_L[d], FIELD_N, FIELD_R, FIELD_Fa, d)
+	print(f"{d}D field, {FIELD_N} sensors, L={FIELD_L[d]} R={FIELD_R} Fa={FIELD_Fa} Ferr={Ferr}")
+
+	start = time.perf_counter()
+	table = simulate_ranges(positions, radii, is_ancor, Ferr)
+	print(f"\tsimulate  {time.perf_counter() - start:8.3f}s {len(table)} ranges")
+
+	for precision in PRECISIONS:
+		start = time.perf_counter()
+		_, localized = localization_core.localize(positions, radii, is_ancor, Ferr, precision=precision, measurements=table)
+		print(f"\t{precision:9} {time.perf_counter() - start:8.3f}s localized {np.count_nonzero(localized)}")
+
+if __name__ == '__main__':
+	run(2, trillateration_2D, trillateration_2D.Circle, trillateration_2D.Point2D)
+	run(3, trillateration_3D, trillateration_3D.Sphere, trillateration_3D.Point3D)
+	run_field(2)
+	run_field(3)
@@ -0,0 +1,179 @@
+import os
+import numpy as np
+
+'''
+	Supported sensor layouts and ancor placements
+'''
+LAYOUTS = ("uniform", "grid", "clustered", "corridor")
+ANCOR_PLACEMENTS = ("first", "random", "perimeter")
+
+CHUNK_SIZE = 1000000
+
+'''
+	Sensors per random stream. Fields are generated in
+	blocks of this size, each from its own stream spawned from the
+	seed, so the field does not depend on the chunk size.
+'''
+BLOCK_SIZE = 65536
+
+'''
+	Positions of sensors [start, start + n) of a field with [N] sensors
+	in a d-dimensional L-cube.
+	uniform - uniformly random
+	grid - jittered regular grid with ceil(N^(1/d)) cells per side,
+	when there are more cells than sensors the empty ones are spread
+	evenly
+	clustered - Gaussian blobs around [centers], clipped to the area
+	corridor - uniform along the first axis, within a band of
+	[corridor_width] * L around the middle of the other axes
+'''
+def layout_positions(layout, start, n, N, d, L, rng, centers = None, spread = 0.05, corridor_width = 0.1, jitter = 0.5):
+	if layout == "uniform":
+		return L * rng.random((n, d))
+
+	if layout == "grid":
+		side = int(np.ceil(N ** (1 / d)))
+		indices = np.arange(start, start + n, dtype=np.int64) * side**d // N
+		cells = np.stack(np.unravel_index(indices, (side,) * d), axis=1)
+		offsets = 0.5 + jitter * (rng.random((n, d)) - 0.5)
+		return (cells + offsets) * (L / side)
+
+	if layout == "clustered":
+		members = centers[rng.integers(len(centers), size=n)]
+		return np.clip(members + rng.normal(0.0, spread * L, size=(n, d)), 0, L)
+
+	if layout == "corridor":
+		positions = L * (0.5 + corridor_width * (rng.random((n, d)) - 0.5))
+		positions[:, 0] = L * rng.random(n)
+		return positions
+
+	raise ValueError(f"Unknown layout {layout}")
+
+'''
+	Uniform positions on the boundary of the L-cube
+'''
+def perimeter_positions(n, d, L, rng):
+	positions = L * rng.random((n, d))
+	axis = rng.integers(d, size=n)
+	positions[np.arange(n), axis] = L * rng.integers(2, size=n)
+	return positions
+
+'''
+	Generates the field in blocks of BLOCK_SIZE sensors as
+	(positions, radii, is_ancor). Every block draws from its own
+	stream and the random ancors are spread over the blocks up front,
+	so any block is the same however the field is consumed.
+'''
+def field_blocks(L, N, R, Fa, dimension, layout, ancors, radius_spread, clusters, seed, layout_options):
+	streams = np.random.SeedSequence(seed)
+	centers_stream, counts_stream = (np.random.default_rng(stream) for stream in streams.spawn(2))
+	centers = L * centers_stream.random((clusters, dimension)) if layout == "clustered" else None
+	ancor_count = int(N * Fa)
+	sizes = np.diff(np.append(np.arange(0, N, BLOCK_SIZE), N))
+	if ancors != "first":
+		# exact ancor count without a global permutation
+		counts = counts_stream.multivariate_hypergeometric(sizes, ancor_count)
+
+	for block, (start, n, stream) in enumerate(zip(range(0, N, BLOCK_SIZE), sizes, streams.spawn(len(sizes)))):
+		rng = np.random.default_rng(stream)
+		positions = layout_positions(layout, start, n, N, dimension, L, rng, centers, **layout_options)
+		radii = R * (1 + radius_spread * (2 * rng.random(n) - 1))
+
+		is_ancor = np.zeros(n, dtype=bool)
+		if ancors == "first":
+			is_ancor[:max(0, min(n, ancor_count - start))] = True
+		else:
+			is_ancor[rng.choice(n, counts[block], replace=False)] = True
+
+		if ancors == "perimeter":
+			positions[is_ancor] = perimeter_positions(np.count_nonzero(is_ancor), dimension, L, rng)
+
+		yield positions, radii, is_ancor
+
+'''
+	Yields the field chunk by chunk as (start, positions, radii, is_ancor).
+	L - Width and height of the area where sensors are placed
+	N - Number of sensors placed
+	R - radio range (radius)
+	Fa - Fraction of ancor sensors [0.0, 1.0]
+	[radius_spread] draws radii uniformly from R * (1 +- radius_spread)
+	[ancors] is one of ANCOR_PLACEMENTS; "first" makes the first
+	int(N * Fa) sensors ancors like generate_sensors, "random" picks
+	exactly int(N * Fa) of them at random and "perimeter" also moves
+	the picked ones onto the boundary of the area.
+	[chunk_size] only bounds memory, the same [seed] gives the same
+	field for any chunk size.
+	[seed] defaults to a draw from np.random, so np.random.seed
+	governs the field like it does for generate_sensors.
+'''
+def iter_field_chunks(L, N, R, Fa, dimension = 2, layout = "uniform", ancors = "random", radius_spread = 0.0, clusters = 8, chunk_size = CHUNK_SIZE, seed = None, **layout_options):
+	assert(Fa >= 0 and Fa <= 1.0)
+	assert(L > 0)
+	assert(R > 0)
+	assert(N > 0)
+	assert(radius_spread >= 0 and radius_spread < 1.0)
+	assert(ancors in ANCOR_PLACEMENTS)
+	assert(chunk_size > 0)
+
+	if seed is None:
+		seed = np.random.randint(2**31)
+
+	start = 0
+	parts = []
+	filled = 0
+	for block in field_blocks(L, N, R, Fa, dimension, layout, ancors, radius_spread, clusters, seed, layout_options):
+		while len(block[1]):
+			take = chunk_size - filled
+			parts.append(tuple(array[:take] for array in block))
+			block = tuple(array[take:] for array in block)
+			filled += len(parts[-1][1])
+			if filled == chunk_size or start + filled == N:
+				yield (start,) + tuple(np.concatenate(arrays) for arrays in zip(*parts))
+				start += filled
+				parts = []
+				filled = 0
+
+'''
+	Generates a whole field into (N, d) positions, (N,) radii and (N,)
+	is_ancor arrays, the input of localization_core. Arguments as for
+	iter_field_chunks. Pass [out] (positions, radii, is_ancor) to fill
+	existing arrays, e.g. the memory maps of create_field_files.
+'''
+def generate_field(L, N, R, Fa, dimension = 2, dtype = np.float64, out = None, **options):
+	if out is None:
+		out = (np.empty((N, dimension), dtype=dtype), np.empty(N, dtype=dtype), np.empty(N, dtype=bool))
+
+	positions, radii, is_ancor = out
+	for start, chunk_positions, chunk_radii, chunk_ancors in iter_field_chunks(L, N, R, Fa, dimension, **options):
+		stop = start + len(chunk_radii)
+		positions[start:stop] = chunk_positions
+		radii[start:stop] = chunk_radii
+		is_ancor[start:stop] = chunk_ancors
+
+	return positions, radii, is_ancor
+
+'''
+	Memory mapped positions.npy, radii.npy and is_ancor.npy
+	in directory [path], ready to be filled by generate_field
+'''
+def create_field_files(path, N, dimension = 2, dtype = np.float64):
+	os.makedirs(path, exist_ok=True)
+	return (
+		np.lib.format.open_memmap(os.path.join(path, "positions.npy"), mode="w+", dtype=dtype, shape=(N, dimension)),
+		np.lib.format.open_memmap(os.path.join(path, "radii.npy"), mode="w+", dtype=dtype, shape=(N,)),
+		np.lib.format.open_memmap(os.path.join(path, "is_ancor.npy"), mode="w+", dtype=bool, shape=(N,)),
+	)
+
+'''
+	Streams a field straight to disk, chunk by chunk
+'''
+def write_field(path, L, N, R, Fa, dimension = 2, dtype = np.float64, **options):
+	out = create_field_files(path, N, dimension, dtype)
+	generate_field(L, N, R, Fa, dimension, dtype, out, **options)
+	for array in out:
+		array.flush()
+
+	return out
+
+def load_field(path, mmap_mode = "r"):
+	return tuple(np.load(os.path.join(path, name), mmap_mode=mmap_mode) for name in ("positions.npy", "radii.npy", "is_ancor.npy"))
@@ -0,0 +1,285 @@
+import itertools
+import numpy as np
+import trillateration_2D
+import trillateration_3D
+
+'''
+	Per-dimension building blocks: trilateration module,
+	shape class passed to its solver and number of shapes needed
+'''
+DIMENSIONS = {
+	2: (trillateration_2D, trillateration_2D.Circle, 3),
+	3: (trillateration_3D, trillateration_3D.Sphere, 4),
+}
+
+'''
+	Uniform grid hashing nodes by their true location.
+	With the cell size close to the radio range a range query
+	only visits the neighbouring cells.
+'''
+class SpatialGrid:
+	def __init__(self, cell_size):
+		self.cell_size = cell_size
+		self.cells = {}
+		self.keys = {}
+
+	def cell_of(self, point):
+		return tuple(int(c) for c in np.floor(point.as_numpy() / self.cell_size))
+
+	def insert(self, node):
+		key = self.cell_of(node.location)
+		self.cells.setdefault(key, {})[node] = None
+		self.keys[node] = key
+
+	def remove(self, node):
+		key = self.keys.pop(node)
+		cell = self.cells[key]
+		del cell[node]
+		if not cell:
+			del self.cells[key]
+
+	def query(self, point, radius):
+		center = self.cell_of(point)
+		reach = int(np.ceil(radius / self.cell_size))
+		nodes = []
+		for offset in itertools.product(range(-reach, reach + 1), repeat=len(center)):
+			key = tuple(c + o for c, o in zip(center, offset))
+			nodes.extend(self.cells.get(key, ()))
+
+		return nodes
+
+'''
+	Keeps a localized field up to date while ancors are added,
+	removed or moved. Only sensors whose candidate ancors or chosen
+	3 (2D) / 4 (3D) ancors change are re-solved; in iterative mode
+	also every sensor downstream of them through the degree chain.
+	Range measurements are cached per (sensor, ancor) pair so
+	untouched sensors keep their noisy ranges between events.
+	[iterative] and [heuristic] mirror localize_sensors_iterative.
+	[ranges] seeds the range cache, e.g. with the ranges of another
+	localizer over the same nodes.
+'''
+class IncrementalLocalizer:
+	def __init__(self, ancors, non_ancors, Ferr, dimension = 2, iterative = False, heuristic = "distance", ranges = None):
+		self.module, self.shape, self.required = DIMENSIONS[dimension]
+		self.Ferr = Ferr
+		self.iterative = iterative
+		self.heuristic = heuristic
+		self.ancors = dict.fromkeys(ancors)
+		self.non_ancors = list(non_ancors)
+		self.reach = max([s.radius for s in self.non_ancors], default=0.0) * (1 + Ferr)
+		self.grid = SpatialGrid(max(self.reach, 1.0))
+		self.ranges = dict(ranges or {})
+		self.candidates = {sensor: {} for sensor in self.non_ancors}
+		self.observers = {}
+		self.chosen = {}
+		self.children = {}
+
+		for node in itertools.chain(self.ancors, self.non_ancors):
+			self.grid.insert(node)
+
+		for ancor in self.ancors:
+			self._publish(ancor)
+
+		self._resolve(dict.fromkeys(self.non_ancors))
+
+	def localized(self):
+		return [sensor for sensor in self.non_ancors if sensor.estimated_location]
+
+	'''
+		Each event returns the sensors that were re-solved and localized
+	'''
+	def add_ancor(self, ancor):
+		return self._relocalize(self._attach(ancor))
+
+	def remove_ancor(self, ancor):
+		return self._relocalize(self._detach(ancor))
+
+	def move_ancor(self, ancor, location):
+		dirty = self._detach(ancor)
+		ancor.location = location
+		dirty.extend(self._attach(ancor))
+		return self._relocalize(dirty)
+
+	def _attach(self, ancor):
+		self.ancors[ancor] = None
+		self.grid.insert(ancor)
+		return [sensor for sensor in self._publish(ancor) if self._choice_changed(sensor)]
+
+	'''
+		Dirty are the sensors that chose [ancor] and the unlocalized
+		sensors whose selection changed without it and can still be solved
+	'''
+	def _detach(self, ancor):
+		del self.ancors[ancor]
+		dirty = list(self.children.pop(ancor, ()))
+		observers = [sensor for sensor in self.observers.get(ancor, ()) if sensor not in self.chosen]
+		before = [self._select(sensor) for sensor in observers]
+		self._retract(ancor)
+		for sensor, selected in zip(observers, before):
+			after = self._select(sensor)
+			if after is not None and after != selected:
+				dirty.append(sensor)
+
+		for sensor in self.grid.query(ancor.location, self.reach):
+			self.ranges.pop((sensor, ancor), None)
+
+		self.grid.remove(ancor)
+		return dirty
+
+	'''
+		Noisy range from [sensor] to [ref], measured once per pair.
+		Noise scale follows the matching batch localizer.
+	'''
+	def _measure(self, sensor, ref):
+		key = (sensor, ref)
+		if key not in self.ranges:
+			scale = sensor.radius if self.iterative else ref.radius
+			d = self.module.distance(sensor.location, ref.location)
+			self.ranges[key] = self.module.add_noise(d, scale * self.Ferr)
+
+		return self.ranges[key]
+
+	def _accepts(self, sensor, ref):
+		if self.iterative:
+			d = self._measure(sensor, ref)
+			return d if d <= sensor.radius else None
+
+		if self.module.distance(sensor.location, ref.location) <= sensor.radius:
+			return self._measure(sensor, ref)
+
+		return None
+
+	'''
+		Makes [ref] a candidate of every sensor in its range.
+		Returns the sensors that gained it.
+	'''
+	def _publish(self, ref):
+		gained = []
+		for sensor in self.grid.query(ref.location, self.reach):
+			if sensor is ref or sensor in self.ancors:
+				continue
+
+			d = self._accepts(sensor, ref)
+			if d is not None:
+				self.candidates[sensor][ref] = d
+				self.observers.setdefault(ref, {})[sensor] = None
+				gained.append(sensor)
+
+		return gained
+
+	def _retract(self, ref):
+		for sensor in self.observers.pop(ref, ()):
+			del self.candidates[sensor][ref]
+
+	def _select(self, sensor):
+		distances = [(d, ref) for ref, d in self.candidates[sensor].items()]
+		if len(distances) < self.required:
+			return None
+
+		if self.iterative and self.heuristic == "degree":
+			distances.sort(key= lambda d: d[1].degree)
+		else:
+			distances.sort(key= lambda d: d[0])
+
+		return [ref for _, ref in distances[:self.required]]
+
+	def _choice_changed(self, sensor):
+		if sensor not in self.chosen:
+			return True
+
+		return self._select(sensor) != self.chosen[sensor]
+
+	def _solve(self, sensor):
+		chosen = self._select(sensor)
+		if not chosen:
+			return False
+
+		shapes = [self.shape(ref.location, self.candidates[sensor][ref]) for ref in chosen]
+		result = self.module.trilaterate_with_noise(*shapes)
+		if not result:
+			return False
+
+		sensor.estimated_location = result
+		if self.iterative:
+			sensor.degree = sum(ref.degree for ref in chosen) + 1
+
+		self.chosen[sensor] = chosen
+		for ref in chosen:
+			self.children.setdefault(ref, {})[sensor] = None
+
+		return True
+
+	def _unlocalize(self, sensor):
+		sensor.estimated_location = None
+		sensor.degree = 0
+		for ref in self.chosen.pop(sensor, ()):
+			self.children.get(ref, {}).pop(sensor, None)
+
+		self._retract(sensor)
+
+	'''
+		Sensors in [seeds] and everything that chose them,
+		transitively, as ancors.
+	'''
+	def _downstream(self, seeds):
+		affected = dict.fromkeys(seeds)
+		queue = list(affected)
+		while queue:
+			for child in self.children.get(queue.pop(), ()):
+				if child not in affected:
+					affected[child] = None
+					queue.append(child)
+
+		return affected
+
+	'''
+		Re-solves [dirty] and everything downstream of it, together
+		with the unlocalized sensors whose selection changed when
+		those were unlocalized and can still be solved
+	'''
+	def _relocalize(self, dirty):
+		affected = self._downstream(dirty)
+		observers = {}
+		for sensor in affected:
+			for observer in self.observers.get(sensor, ()):
+				if observer not in affected and observer not in self.chosen:
+					observers[observer] = None
+
+		before = [self._select(observer) for observer in observers]
+		for sensor in affected:
+			self._unlocalize(sensor)
+
+		for observer, selected in zip(observers, before):
+			after = self._select(observer)
+			if after is not None and after != selected:
+				affected[observer] = None
+
+		return self._resolve(affected)
+
+	'''
+		Localizes the [pending] sensors in passes like
+		localize_sensors_iterative. In iterative mode every newly
+		localized sensor becomes an ancor for its neighbours, which
+		are retried while passes keep making progress.
+	'''
+	def _resolve(self, pending):
+		resolved = []
+		while pending:
+			progress = False
+			for sensor in list(pending):
+				if not self._solve(sensor):
+					continue
+
+				del pending[sensor]
+				resolved.append(sensor)
+				progress = True
+				if self.iterative:
+					for neighbour in self._publish(sensor):
+						if neighbour not in self.chosen:
+							pending[neighbour] = None
+
+			if not progress or not self.iterative:
+				break
+
+		return resolved
@@ -0,0 +1,305 @@
+import numpy as np
+from batched_trilateration import CUTTOF_VAL, trilaterate_batch
+from measurements import simulate_ranges
+
+'''
+	Dimension generic localization engine working on (N, d) arrays.
+	Any dimension with an intersection kernel in
+	batched_trilateration.KERNELS is supported; a sensor needs d + 1
+	ancors to be trilaterated.
+'''
+
+'''
+	Sensors solved together by localize, bounds the number of
+	sensor-ancor pairs held in memory on large fields
+'''
+SENSOR_CHUNK = 100000
+
+'''
+	Sub-rounds of an iterative round. The pending sensors of a round
+	are solved in this many groups in index order, so sensors
+	localized early in a round already serve the later groups like
+	in the sequential passes of localize_sensors_iterative.
+'''
+SUB_ROUNDS = 16
+
+'''
+	Fixed budget of the "ransac" solver: hypotheses per sensor,
+	in range ancors considered per sensor and Gauss-Newton steps
+	of the final refinement on the inliers.
+'''
+RANSAC_ITERATIONS = 16
+RANSAC_MAX_ANCORS = 12
+REFINE_STEPS = 3
+
+'''
+	Orders the pairs of every row by [keys], ties broken by [ties],
+	and keeps the first [limit] of them.
+	Returns the rows with at least k pairs, a (rows, width) table of
+	pair indices and the mask of its filled entries.
+'''
+def candidate_table(rows, keys, ties, k, limit, n_rows):
+	order = np.lexsort((ties, keys, rows))
+	counts = np.bincount(rows, minlength=n_rows)
+	starts = np.cumsum(counts) - counts
+	eligible = np.flatnonzero(counts >= k)
+	width = min(limit, np.max(counts[eligible], initial=k))
+	offsets = np.arange(width)
+	valid = offsets < counts[eligible][:, None]
+	table = order[np.minimum(starts[eligible][:, None] + offsets, max(len(order) - 1, 0))]
+	return eligible, table, valid
+
+'''
+	Picks the first [k] pairs of every row ordered by [keys],
+	ties broken by [ties].
+	Returns the rows with at least k pairs and a (rows, k) array
+	of the picked pair indices.
+'''
+def select_pairs(rows, keys, ties, k, n_rows):
+	eligible, table, _ = candidate_table(rows, keys, ties, k, k, n_rows)
+	return eligible, table
+
+'''
+	Gauss-Newton refinement of [estimates] (M, d) against the ranges
+	(M, C) to [centers] (M, C, d) where [weights] (M, C) is set.
+	Steps that do not lower the weighted squared residual are rejected.
+'''
+def refine_least_squares(estimates, centers, ranges, weights, steps = REFINE_STEPS):
+	d = estimates.shape[1]
+	weights = weights.astype(estimates.dtype)
+	enough = (np.sum(weights, axis=1) > d) & np.all(np.isfinite(estimates), axis=1)
+
+	def residuals(x):
+		delta = x[:, None, :] - centers
+		dist = np.maximum(np.linalg.norm(delta, axis=2), CUTTOF_VAL)
+		return delta / dist[:, :, None], dist - ranges
+
+	x = np.where(enough[:, None], estimates, 0)
+	J, r = residuals(x)
+	cost = np.sum(weights * r**2, axis=1)
+	for _ in range(steps):
+		JtJ = np.einsum("mc,mci,mcj->mij", weights, J, J) + 1e-9 * np.eye(d)
+		Jtr = np.einsum("mc,mci,mc->mi", weights, J, r)
+		candidate = x - np.linalg.solve(JtJ, Jtr[:, :, None])[:, :, 0]
+		J_new, r_new = residuals(candidate)
+		cost_new = np.sum(weights * r_new**2, axis=1)
+		better = enough & (cost_new < cost)
+		x = np.where(better[:, None], candidate, x)
+		J = np.where(better[:, None, None], J_new, J)
+		r = np.where(better[:, None], r_new, r)
+		cost = np.where(better, cost_new, cost)
+
+	return np.where(enough[:, None], x, estimates)
+
+'''
+	RANSAC over minimal ancor subsets. Every row of [table] (pair
+	indices, [valid] marks filled entries) draws [iterations] random
+	subsets of k ancors, the first being the k leading ones. Each
+	hypothesis is scored by the number of ancors whose range it
+	matches within [threshold] (M, C), the noise bound of each pair;
+	the best one is refined on its inliers.
+	Returns estimates (M, d), localized mask (M,) and the (M, k)
+	pair indices of the winning subsets.
+'''
+def ransac(table, valid, centers, ranges, k, threshold, iterations = RANSAC_ITERATIONS, precision = "float64"):
+	M, C = table.shape
+	d = centers.shape[1]
+	index = np.arange(M)[:, None]
+	row_centers = centers[table]
+	row_ranges = ranges[table]
+
+	best_score = np.full(M, -np.inf)
+	best_estimates = np.full((M, d), np.nan)
+	best_sample = np.broadcast_to(np.arange(k), (M, k))
+	best_inliers = np.zeros((M, C), dtype=bool)
+	for iteration in range(iterations):
+		if iteration == 0:
+			sample = np.broadcast_to(np.arange(k), (M, k))
+		else:
+			draw = np.where(valid, np.random.rand(M, C), 2.0)
+			sample = np.argpartition(draw, k - 1, axis=1)[:, :k]
+
+		estimates, ok, _ = trilaterate_batch(row_centers[index, sample], row_ranges[index, sample], precision)
+		with np.errstate(invalid="ignore"):
+			errors = np.abs(np.linalg.norm(estimates[:, None, :] - row_centers, axis=2) - row_ranges)
+			inliers = valid & ok[:, None] & (errors <= threshold)
+
+		count = np.sum(inliers, axis=1)
+		spread = np.sum(np.where(inliers, (errors / threshold)**2, 0), axis=1) / (2 * np.maximum(count, 1))
+		score = np.where(ok, count - spread, -np.inf)
+		better = score > best_score
+		best_score = np.where(better, score, best_score)
+		best_estimates = np.where(better[:, None], estimates, best_estimates)
+		best_sample = np.where(better[:, None], sample, best_sample)
+		best_inliers = np.where(better[:, None], inliers, best_inliers)
+
+	localized = np.isfinite(best_score)
+	estimates = refine_least_squares(best_estimates, row_centers, row_ranges, best_inliers & localized[:, None])
+	return estimates, localized, table[index, best_sample]
+
+'''
+	Trilaterates every row from its pairs with the selected [solver]:
+	"nearest" uses the first d + 1 pairs ordered by [keys],
+	"ransac" runs ransac over them, [noise] (pairs,) bounds the range
+	error of every pair.
+	Returns the localized rows, their estimates and the (rows, d + 1)
+	pair indices they were solved from.
+'''
+def solve_pairs(rows, centers, ranges, keys, ties, noise, n_rows, solver = "nearest", precision = "float64"):
+	k = centers.shape[1] + 1
+	if solver == "ransac":
+		eligible, table, valid = candidate_table(rows, keys, ties, k, RANSAC_MAX_ANCORS, n_rows)
+		threshold = np.maximum(noise[table], CUTTOF_VAL)
+		result, ok, picks = ransac(table, valid, centers, ranges, k, threshold, precision=precision)
+	elif solver == "nearest":
+		eligible, picks = select_pairs(rows, keys, ties, k, n_rows)
+		result, ok, _ = trilaterate_batch(centers[picks], ranges[picks], precision)
+	else:
+		raise ValueError(f"Unknown solver {solver}")
+
+	return eligible[ok], result[ok], picks[ok]
+
+'''
+	Solves the sensors measured in [table] from the measurements to
+	known nodes ([known] mask, located at [located]).
+	[pending] optionally restricts the solved sensors (mask).
+	[iterative] selects the noise model of simulate_ranges: the range
+	error is bounded by Ferr * sensor radius, otherwise by Ferr *
+	ancor radius.
+	Returns the localized sensors (node indices), their estimates and
+	the (sensors, d + 1) node indices they were solved from.
+'''
+def solve_table(table, located, known, radii, Ferr, keys = None, ties = None, solver = "nearest", precision = "float64", pending = None, iterative = False):
+	usable = known[table.ancors] & ~known[table.sensors]
+	if pending is not None:
+		usable &= pending[table.sensors]
+
+	sensors, cols, ranges = table.sensors[usable], table.ancors[usable], table.ranges[usable]
+	row_ids, rows = np.unique(sensors, return_inverse=True)
+	keys = ranges if keys is None else keys[cols]
+	ties = cols if ties is None else ties[cols]
+	noise = Ferr * radii[sensors if iterative else cols]
+	solved, result, picks = solve_pairs(rows, located[cols], ranges, keys, ties, noise, len(row_ids), solver, precision)
+	return row_ids[solved], result, cols[picks]
+
+'''
+	Noniterative localization. Every non ancor sensor is trilaterated
+	from the d + 1 in range ancors with the smallest measured ranges.
+	positions - (N, d) locations; only ancor rows are read when
+	[measurements] is given, radii - (N,) radio ranges,
+	is_ancor - (N,) mask of ancor sensors
+	[measurements] is a RangeTable of measured ranges; without it
+	the ranges are simulated from the true positions, SENSOR_CHUNK
+	sensors at a time.
+	[solver] is "nearest" or "ransac", see solve_pairs.
+	Returns estimates (N, d) (NaN if not localized) and localized mask (N,).
+'''
+def localize(positions, radii, is_ancor, Ferr, solver = "nearest", precision = "float64", measurements = None):
+	N, d = positions.shape
+	sensors = np.flatnonzero(~is_ancor)
+	estimates = np.full((N, d), np.nan)
+	localized = np.zeros(N, dtype=bool)
+	if measurements is not None:
+		tables = [measurements]
+	else:
+		tables = (simulate_ranges(positions, radii, is_ancor, Ferr, sensors=sensors[start:start + SENSOR_CHUNK]) for start in range(0, len(sensors), SENSOR_CHUNK))
+
+	for table in tables:
+		solved, result, _ = solve_table(table, positions, is_ancor, radii, Ferr, solver=solver, precision=precision)
+		estimates[solved] = result
+		localized[solved] = True
+
+	return estimates, localized
+
+'''
+	Iterative localization. Localized sensors act as ancors for the
+	following rounds, [heuristic] ("distance" or "degree") decides
+	which d + 1 ancors a sensor uses. A round solves the pending
+	sensors in [sub_rounds] groups in index order, each against the
+	ancors known at its start.
+	With [measurements] every round uses the same RangeTable and
+	localized sensors are located at their estimates. Without it the
+	ranges of pending sensors to known nodes are simulated again every
+	round from the true positions, which also locate the localized
+	sensors, as in IncrementalLocalizer.
+	The "ransac" [solver] keeps a single bad range from breaking the
+	degree chain.
+	Returns estimates (N, d), localized mask (N,), degree (N,) and
+	the round (N,) in which each sensor was localized (-1 if never).
+'''
+def localize_iterative(positions, radii, is_ancor, Ferr, heuristic = "distance", solver = "nearest", precision = "float64", measurements = None, sub_rounds = SUB_ROUNDS):
+	N, d = positions.shape
+	estimates = np.full((N, d), np.nan)
+	localized = np.zeros(N, dtype=bool)
+	degree = np.zeros(N, dtype=np.int64)
+	rounds = np.full(N, -1, dtype=np.int64)
+	located = positions if measurements is None else np.where(is_ancor[:, None], positions, np.nan)
+	known = is_ancor.copy()
+	sequence = np.where(is_ancor, np.cumsum(is_ancor) - 1, N)
+	current = 0
+	keys = degree if heuristic == "degree" else None
+	progress = True
+	while progress and not np.all(known):
+		progress = False
+		pending = np.flatnonzero(~known)
+		for group in np.array_split(pending, min(sub_rounds, len(pending))):
+			if measurements is None:
+				table = simulate_ranges(positions, radii, is_ancor, Ferr, True, group, np.flatnonzero(known))
+				solved, result, chosen = solve_table(table, located, known, radii, Ferr, keys, sequence, solver, precision, iterative=True)
+			else:
+				in_group = np.zeros(N, dtype=bool)
+				in_group[group] = True
+				solved, result, chosen = solve_table(measurements, located, known, radii, Ferr, keys, sequence, solver, precision, in_group, True)
+
+			if len(solved) == 0:
+				continue
+
+			estimates[solved] = result
+			if measurements is not None:
+				located[solved] = result
+
+			localized[solved] = True
+			known[solved] = True
+			degree[solved] = np.sum(degree[chosen], axis=1) + 1
+			rounds[solved] = current
+			sequence[solved] = np.count_nonzero(known) - len(solved) + np.arange(len(solved))
+			progress = True
+
+		current += 1
+
+	return estimates, localized, degree, rounds
+
+'''
+	Runs the engine on Sensor2D/Sensor3D objects and writes the
+	estimates back. [point] builds the dimension's point type.
+	[measurements] is an optional RangeTable indexing the sensors as
+	ancors followed by non_ancors; with it non_ancors need no location.
+	Returns the localized sensors, in order of localization.
+'''
+def localize_sensor_objects(ancors, non_ancors, Ferr, point, iterative = False, heuristic = "distance", solver = "nearest", precision = "float64", measurements = None):
+	sensors = list(ancors) + list(non_ancors)
+	if not sensors:
+		return []
+
+	d = next(len(sensor.location.as_numpy()) for sensor in sensors if sensor.location)
+	positions = np.array([sensor.location.as_numpy() if sensor.location else np.full(d, np.nan) for sensor in sensors], dtype=np.float64)
+	radii = np.array([sensor.radius for sensor in sensors], dtype=np.float64)
+	is_ancor = np.arange(len(sensors)) < len(ancors)
+	if iterative:
+		estimates, localized, degree, rounds = localize_iterative(positions, radii, is_ancor, Ferr, heuristic, solver, precision, measurements)
+		order = np.lexsort((np.arange(len(sensors)), rounds))
+	else:
+		estimates, localized = localize(positions, radii, is_ancor, Ferr, solver, precision, measurements)
+		degree = None
+		order = np.arange(len(sensors))
+
+	result = []
+	for i in order[localized[order]]:
+		sensor = sensors[i]
+		sensor.estimated_location = point(*estimates[i])
+		if degree is not None:
+			sensor.degree = int(degree[i])
+
+		result.append(sensor)
+
+	return result
@@ -0,0 +1,126 @@
+import itertools
+import numpy as np
+
+'''
+	Sparse table of range measurements in COO form: [sensors] measured
+	the range [ranges] to [ancors]. Both are node indices into the
+	(N,) field arrays of localization_core; an ancor index may also be
+	a non ancor sensor, which iterative localization uses once that
+	sensor is localized.
+'''
+class RangeTable:
+	def __init__(self, sensors, ancors, ranges, n_nodes):
+		self.sensors = np.asarray(sensors, dtype=np.int64)
+		self.ancors = np.asarray(ancors, dtype=np.int64)
+		self.ranges = np.asarray(ranges, dtype=np.float64)
+		self.n_nodes = n_nodes
+		assert(self.sensors.shape == self.ancors.shape == self.ranges.shape)
+
+	def __repr__(self):
+		return f"RangeTable {len(self)} measurements over {self.n_nodes} nodes\n"
+
+	def __len__(self):
+		return len(self.ranges)
+
+	'''
+		CSR form: the measurements of sensor i are
+		indices[indptr[i]:indptr[i + 1]] with ranges at the same slots
+	'''
+	def to_csr(self):
+		order = np.argsort(self.sensors, kind="stable")
+		indptr = np.zeros(self.n_nodes + 1, dtype=np.int64)
+		np.cumsum(np.bincount(self.sensors, minlength=self.n_nodes), out=indptr[1:])
+		return indptr, self.ancors[order], self.ranges[order]
+
+	@classmethod
+	def from_csr(cls, indptr, indices, ranges):
+		indptr = np.asarray(indptr, dtype=np.int64)
+		sensors = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+		return cls(sensors, indices, ranges, len(indptr) - 1)
+
+	def select(self, mask):
+		return RangeTable(self.sensors[mask], self.ancors[mask], self.ranges[mask], self.n_nodes)
+
+'''
+	All (row, col) pairs of [points] and [refs] closer than [reach],
+	found by hashing [refs] into a uniform grid with cell size [reach].
+	Returns row indices, col indices and distances of the pairs.
+'''
+def neighbour_pairs(points, refs, reach):
+	d = points.shape[1]
+	point_cells = np.floor(points / reach).astype(np.int64)
+	ref_cells = np.floor(refs / reach).astype(np.int64)
+	low = min(point_cells.min(initial=0), ref_cells.min(initial=0)) - 1
+	extent = max(point_cells.max(initial=0), ref_cells.max(initial=0)) - low + 2
+	strides = extent ** np.arange(d, dtype=np.int64)
+
+	ref_keys = (ref_cells - low) @ strides
+	order = np.argsort(ref_keys, kind="stable")
+	sorted_keys = ref_keys[order]
+
+	rows = []
+	cols = []
+	for offset in itertools.product((-1, 0, 1), repeat=d):
+		keys = (point_cells - low + np.array(offset)) @ strides
+		start = np.searchsorted(sorted_keys, keys, "left")
+		counts = np.searchsorted(sorted_keys, keys, "right") - start
+		total = np.sum(counts)
+		first = np.cumsum(counts) - counts
+		rows.append(np.repeat(np.arange(len(points)), counts))
+		cols.append(order[np.repeat(start - first, counts) + np.arange(total)])
+
+	rows = np.concatenate(rows)
+	cols = np.concatenate(cols)
+	distances = np.linalg.norm(points[rows] - refs[cols], axis=1)
+	keep = distances <= reach
+	return rows[keep], cols[keep], distances[keep]
+
+'''
+	Vectorized add_noise: Gaussian noise truncated to
+	[-noise_scale, noise_scale], ranges that would become
+	negative are left unchanged.
+'''
+def add_noise(d, noise_scale):
+	noise = np.random.normal(0.0, 0.3, size=np.shape(d))
+	outside = np.abs(noise) > 1
+	while np.any(outside):
+		noise[outside] = np.random.normal(0.0, 0.3, size=np.count_nonzero(outside))
+		outside = np.abs(noise) > 1
+
+	noisy = d + noise_scale * noise
+	return np.where(noisy < 0, d, noisy)
+
+'''
+	Simulates the range measurements of a field with known true
+	[positions] the way the localizers used to:
+	noniterative - every sensor measures the ancors within its radius,
+	noise scale is Ferr * ancor radius
+	iterative - every sensor measures all other nodes, noise scale is
+	Ferr * sensor radius, and keeps the ranges within its radius
+	[sensors] and [ancors] restrict the measuring and measured nodes
+	(node indices), by default all non ancors and all ancors
+	(iterative: all nodes).
+'''
+def simulate_ranges(positions, radii, is_ancor, Ferr, iterative = False, sensors = None, ancors = None):
+	N = len(positions)
+	if sensors is None:
+		sensors = np.flatnonzero(~is_ancor)
+
+	if ancors is None:
+		ancors = np.arange(N) if iterative else np.flatnonzero(is_ancor)
+
+	if len(sensors) == 0 or len(ancors) == 0:
+		return RangeTable([], [], [], N)
+
+	reach = np.max(radii[sensors]) * ((1 + Ferr) if iterative else 1)
+	rows, cols, distances = neighbour_pairs(positions[sensors], positions[ancors], reach)
+	rows, cols = sensors[rows], ancors[cols]
+	if iterative:
+		ranges = add_noise(distances, radii[rows] * Ferr)
+		keep = (ranges <= radii[rows]) & (rows != cols)
+	else:
+		keep = distances <= radii[rows]
+		ranges = np.empty(len(distances))
+		ranges[keep] = add_noise(distances[keep], radii[cols[keep]] * Ferr)
+
+	return RangeTable(rows[keep], cols[keep], ranges[keep], N)
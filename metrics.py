@@ -0,0 +1,154 @@
+import numpy as np
+
+PERCENTILES = (50, 90, 95, 99)
+
+'''
+	Localization error of every sensor from (N, d) arrays of true and
+	estimated locations. Sensors without an estimate (NaN) get NaN.
+'''
+def localization_errors(true_positions, estimates):
+	return np.linalg.norm(np.asarray(estimates, dtype=np.float64) - np.asarray(true_positions, dtype=np.float64), axis=1)
+
+'''
+	Localization errors of Sensor2D/Sensor3D objects, NaN for
+	sensors without an estimated location
+'''
+def sensor_errors(sensors):
+	sensors = list(sensors)
+	if not sensors:
+		return np.empty(0)
+
+	true_positions = np.array([s.location.as_numpy() for s in sensors], dtype=np.float64)
+	estimates = np.array([s.estimated_location.as_numpy() if s.estimated_location else np.full(true_positions.shape[1], np.nan) for s in sensors])
+	return localization_errors(true_positions, estimates)
+
+'''
+	Summary statistics of an error vector (NaN = not localized).
+	[total] is the number of sensors that should have been localized,
+	defaults to len(errors).
+	ALE, RMSE, max and percentiles are None when nothing was localized.
+'''
+def summarize(errors, total = None, percentiles = PERCENTILES):
+	errors = np.asarray(errors, dtype=np.float64)
+	localized = errors[np.isfinite(errors)]
+	total = len(errors) if total is None else total
+	summary = {
+		"total": total,
+		"localized": len(localized),
+		"localized_fraction": len(localized) / total if total else 0.0,
+		"ale": None,
+		"rmse": None,
+		"max": None,
+		"percentiles": {p: None for p in percentiles},
+	}
+	if len(localized):
+		summary["ale"] = float(np.mean(localized))
+		summary["rmse"] = float(np.sqrt(np.mean(localized**2)))
+		summary["max"] = float(np.max(localized))
+		summary["percentiles"] = dict(zip(percentiles, np.percentile(localized, percentiles).tolist()))
+
+	return summary
+
+'''
+	Empirical CDF of the localized errors evaluated at [thresholds]:
+	fraction of localized sensors with error <= threshold
+'''
+def error_cdf(errors, thresholds):
+	errors = np.asarray(errors, dtype=np.float64)
+	localized = np.sort(errors[np.isfinite(errors)])
+	if not len(localized):
+		return np.zeros(len(thresholds))
+
+	return np.searchsorted(localized, thresholds, "right") / len(localized)
+
+'''
+	Streaming error statistics. Keeps counts, sums and a fixed-bin
+	histogram over [0, max_error] (larger errors go to an overflow bin),
+	so chunks or parallel runs can be merged without keeping the
+	per-sensor errors. Percentiles and the CDF are resolved to
+	max_error / bins.
+'''
+class ErrorAccumulator:
+	def __init__(self, max_error, bins = 1000):
+		self.edges = np.linspace(0.0, max_error, bins + 1)
+		self.histogram = np.zeros(bins + 1, dtype=np.int64)
+		self.total = 0
+		self.localized = 0
+		self.sum = 0.0
+		self.sum_sq = 0.0
+		self.max = None
+
+	def __repr__(self):
+		return f"ErrorAccumulator {self.localized}/{self.total} ALE: {self.ale()}"
+
+	def update(self, errors, total = None):
+		errors = np.asarray(errors, dtype=np.float64)
+		localized = errors[np.isfinite(errors)]
+		self.total += len(errors) if total is None else total
+		self.localized += len(localized)
+		self.sum += float(np.sum(localized))
+		self.sum_sq += float(np.sum(localized**2))
+		if len(localized):
+			self.max = max(self.max or 0.0, float(np.max(localized)))
+
+		bins = np.searchsorted(self.edges, localized, "right") - 1
+		self.histogram += np.bincount(np.clip(bins, 0, len(self.histogram) - 1), minlength=len(self.histogram))
+		return self
+
+	def merge(self, other):
+		assert(np.array_equal(self.edges, other.edges))
+		self.histogram += other.histogram
+		self.total += other.total
+		self.localized += other.localized
+		self.sum += other.sum
+		self.sum_sq += other.sum_sq
+		if other.max is not None:
+			self.max = max(self.max or 0.0, other.max)
+
+		return self
+
+	def localized_fraction(self):
+		return self.localized / self.total if self.total else 0.0
+
+	def ale(self):
+		return self.sum / self.localized if self.localized else None
+
+	def rmse(self):
+		return float(np.sqrt(self.sum_sq / self.localized)) if self.localized else None
+
+	'''
+		Percentile interpolated inside its histogram bin
+	'''
+	def percentile(self, p):
+		if not self.localized:
+			return None
+
+		rank = p / 100 * self.localized
+		cumulative = np.cumsum(self.histogram)
+		i = min(np.searchsorted(cumulative, rank, "left"), len(self.histogram) - 1)
+		if i == len(self.histogram) - 1:
+			return self.max
+
+		below = cumulative[i] - self.histogram[i]
+		fraction = (rank - below) / self.histogram[i] if self.histogram[i] else 0.0
+		return float(self.edges[i] + fraction * (self.edges[i + 1] - self.edges[i]))
+
+	'''
+		Fraction of localized sensors with error <= each upper bin edge
+	'''
+	def cdf(self):
+		if not self.localized:
+			return self.edges[1:], np.zeros(len(self.edges) - 1)
+
+		return self.edges[1:], np.cumsum(self.histogram[:-1]) / self.localized
+
+	def summary(self, percentiles = PERCENTILES):
+		return {
+			"total": self.total,
+			"localized": self.localized,
+			"localized_fraction": self.localized_fraction(),
+			"ale": self.ale(),
+			"rmse": self.rmse(),
+			"max": self.max,
+			"percentiles": {p: self.percentile(p) for p in percentiles},
+		}
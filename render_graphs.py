@@ -0,0 +1,128 @@
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+
+RESULTS_FILE = "graphs/sweep_results.csv"
+FIELDS = ["algorithm", "Fa", "Ferr", "R", "localized", "ale"]
+
+'''
+	Sweep algorithms and their figure titles
+'''
+ALGORITHMS = {
+	"ni_2D": "Noniterative 2D algorithm",
+	"i_dist_2D": "Iterative 2D algorithm - distance heuristic",
+	"i_deg_2D": "Iterative 2D algorithm - degree heuristic",
+	"ni_3D": "Noniterative 3D algorithm",
+	"i_dist_3D": "Iterative 3D algorithm - distance heuristic",
+	"i_deg_3D": "Iterative 3D algorithm - degree heuristic",
+}
+
+'''
+	Separator before the algorithm in the ALE titles,
+	the noniterative 2D title stays on one line
+'''
+ALE_TITLE_BREAKS = {"ni_2D": " "}
+
+'''
+	Opens a sweep result table for writing,
+	rows are added with writer.writerow(dict)
+'''
+def open_results(path = RESULTS_FILE):
+	os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+	results = open(path, "w", newline="")
+	writer = csv.DictWriter(results, fieldnames=FIELDS)
+	writer.writeheader()
+	return results, writer
+
+'''
+	Reads a sweep result table, missing ALE values become NaN
+'''
+def read_results(path = RESULTS_FILE):
+	rows = []
+	with open(path, newline="") as results:
+		for row in csv.DictReader(results):
+			for field in FIELDS[1:]:
+				row[field] = float(row[field]) if row[field] not in ("", "None") else np.nan
+
+			rows.append(row)
+
+	return rows
+
+def draw_curves(curves_y, curves_x, x_label, y_label, title, legend_strs, file_name):
+	colors = ["red", "blue", "green", "purple", "orange"]
+	fig, ax = plt.subplots(1)
+	for i in range(len(curves_y)):
+		ax.plot(curves_x, curves_y[i], color=colors[i % len(colors)], label=legend_strs[i])
+
+	ax.set_xlabel(x_label)
+	ax.set_ylabel(y_label)
+	ax.set_title(title)
+	ax.legend(loc="best")
+	fig.savefig(file_name)
+	plt.close(fig)
+	return file_name
+
+def _draw(job):
+	return draw_curves(*job)
+
+'''
+	draw_curves arguments of every figure of the sweep: ALE over range
+	per algorithm and ancor fraction (one curve per noise level) and
+	localization frequency of the noniterative algorithms (one curve
+	per ancor fraction, at the lowest noise level)
+'''
+def figure_jobs(rows, out_dir = "graphs"):
+	Rs = sorted({row["R"] for row in rows})
+	Fas = sorted({row["Fa"] for row in rows})
+	Ferrs = sorted({row["Ferr"] for row in rows})
+	table = {(row["algorithm"], row["Fa"], row["Ferr"], row["R"]): row for row in rows}
+
+	def curve(algorithm, Fa, Ferr, field):
+		return [table[(algorithm, Fa, Ferr, R)][field] if (algorithm, Fa, Ferr, R) in table else np.nan for R in Rs]
+
+	jobs = []
+	algorithms = [algorithm for algorithm in ALGORITHMS if any(row["algorithm"] == algorithm for row in rows)]
+	for Fa in Fas:
+		for algorithm in algorithms:
+			separator = ALE_TITLE_BREAKS.get(algorithm, " \n")
+			jobs.append((
+				[curve(algorithm, Fa, Ferr, "ale") for Ferr in Ferrs], Rs, "Range", "ALE",
+				f"ALE for Ancor sensor frequency: {int(Fa * 100)}%{separator}({ALGORITHMS[algorithm]})",
+				[f"Noise: {int(fer * 100)}%" for fer in Ferrs],
+				os.path.join(out_dir, f"err_curves_{algorithm}_Fa_{Fa}.png"),
+			))
+
+	for algorithm in algorithms:
+		if not algorithm.startswith("ni_"):
+			continue
+
+		jobs.append((
+			[curve(algorithm, Fa, Ferrs[0], "localized") for Fa in Fas], Rs, "Range", "Localization freq",
+			f"Localization frequency ({ALGORITHMS[algorithm]})",
+			[f"Ancor feq: {int(fa * 100)}%" for fa in Fas],
+			os.path.join(out_dir, f"lf_{algorithm[len('ni_'):]}.png"),
+		))
+
+	return jobs
+
+'''
+	Renders every figure of a sweep result table into [out_dir],
+	[workers] processes in parallel. Needs no display, the workers
+	draw with the Agg backend.
+	Returns the written file names.
+'''
+def render_all(path = RESULTS_FILE, out_dir = "graphs", workers = None):
+	os.makedirs(out_dir, exist_ok=True)
+	jobs = figure_jobs(read_results(path), out_dir)
+	with ProcessPoolExecutor(workers, initializer=matplotlib.use, initargs=("Agg",)) as pool:
+		return list(pool.map(_draw, jobs))
+
+if __name__ == '__main__':
+	path = sys.argv[1] if len(sys.argv) > 1 else RESULTS_FILE
+	out_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.dirname(path) or "."
+	for file_name in render_all(path, out_dir):
+		print(file_name)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+import trillateration_2D
+import trillateration_3D
+from batched_trilateration import trilaterate_batch
+
+MODULES = {
+	2: (trillateration_2D, trillateration_2D.Circle, trillateration_2D.Point2D),
+	3: (trillateration_3D, trillateration_3D.Sphere, trillateration_3D.Point3D),
+}
+
+'''
+	M sensors in a 1000-cube, each with d + 1 ancors within R = 100
+	and ranges off by up to Ferr * R
+'''
+def problems(M, d, Ferr, seed):
+	rng = np.random.default_rng(seed)
+	truth = 1000 * rng.random((M, d))
+	directions = rng.normal(size=(M, d + 1, d))
+	directions /= np.linalg.norm(directions, axis=2, keepdims=True)
+	centers = truth[:, None, :] + 100 * rng.random((M, d + 1, 1)) * directions
+	ranges = np.linalg.norm(centers - truth[:, None, :], axis=2)
+	return truth, centers, np.abs(ranges + Ferr * 100 * rng.uniform(-1, 1, ranges.shape))
+
+'''
+	The batch follows trilaterate_with_noise row by row
+'''
+@pytest.mark.parametrize("d", [2, 3])
+def test_matches_scalar(d):
+	module, shape, point = MODULES[d]
+	_, centers, ranges = problems(500, d, 0.1, d)
+	estimates, localized, _ = trilaterate_batch(centers, ranges)
+	for i in range(len(centers)):
+		result = module.trilaterate_with_noise(*[shape(point(*c), r) for c, r in zip(centers[i], ranges[i])])
+		assert bool(result) == localized[i]
+		if result:
+			assert np.allclose(result.as_numpy(), estimates[i], atol=1e-6)
+
+@pytest.mark.parametrize("d", [2, 3])
+@pytest.mark.parametrize("Ferr", [0.1, 0.5])
+def test_float32_agrees_with_float64(d, Ferr):
+	_, centers, ranges = problems(20000, d, Ferr, 0)
+	reference, reference_localized, _ = trilaterate_batch(centers, ranges, "float64")
+	estimates, localized, _ = trilaterate_batch(centers, ranges, "float32")
+	assert np.array_equal(localized, reference_localized)
+	assert np.max(np.linalg.norm(estimates[localized] - reference[localized], axis=1)) < 1e-2
+
+'''
+	Exact ranges put the remaining shape within the rounding band,
+	so float32 re-solves those rows in float64
+'''
+@pytest.mark.parametrize("d", [2, 3])
+def test_float32_refines_exact_rows(d):
+	truth, centers, ranges = problems(5000, d, 0.0, 1)
+	reference, reference_localized, _ = trilaterate_batch(centers, ranges, "float64")
+	estimates, localized, _ = trilaterate_batch(centers, ranges, "float32")
+	assert np.array_equal(localized, reference_localized)
+	assert np.mean(localized) > 0.99
+	assert np.allclose(estimates[localized], reference[localized], rtol=0, atol=1e-9)
+	assert np.allclose(estimates[localized], truth[localized], rtol=0, atol=1e-6)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+import field_generator
+
+'''
+	The chunk size only bounds memory, the seed alone fixes the field
+'''
+@pytest.mark.parametrize("layout", field_generator.LAYOUTS)
+@pytest.mark.parametrize("ancors", field_generator.ANCOR_PLACEMENTS)
+def test_chunk_size_independent(layout, ancors):
+	reference = field_generator.generate_field(100, 5000, 10, 0.3, 2, seed=3, layout=layout, ancors=ancors)
+	for chunk_size in (1000, 777):
+		field = field_generator.generate_field(100, 5000, 10, 0.3, 2, seed=3, layout=layout, ancors=ancors, chunk_size=chunk_size)
+		for expected, array in zip(reference, field):
+			assert np.array_equal(expected, array)
+
+def test_chunk_size_independent_across_blocks():
+	N = 2 * field_generator.BLOCK_SIZE + 1
+	reference = field_generator.generate_field(100, N, 10, 0.3, 3, seed=5, ancors="perimeter")
+	starts = []
+	for start, positions, radii, is_ancor in field_generator.iter_field_chunks(100, N, 10, 0.3, 3, ancors="perimeter", chunk_size=70001, seed=5):
+		starts.append(start)
+		assert np.array_equal(positions, reference[0][start:start + len(radii)])
+		assert np.array_equal(radii, reference[1][start:start + len(radii)])
+		assert np.array_equal(is_ancor, reference[2][start:start + len(radii)])
+
+	assert starts == list(range(0, N, 70001))
+
+@pytest.mark.parametrize("ancors", field_generator.ANCOR_PLACEMENTS)
+@pytest.mark.parametrize("N, Fa", [(5000, 0.3), (2 * field_generator.BLOCK_SIZE + 7, 0.05), (100, 1.0), (100, 0.0)])
+def test_exact_ancor_count(ancors, N, Fa):
+	_, _, is_ancor = field_generator.generate_field(100, N, 10, Fa, 2, seed=1, ancors=ancors, chunk_size=999)
+	assert np.count_nonzero(is_ancor) == int(N * Fa)
+	if ancors == "first":
+		assert np.all(is_ancor[:int(N * Fa)])
+
+def test_perimeter_ancors_on_boundary():
+	positions, _, is_ancor = field_generator.generate_field(100, 5000, 10, 0.3, 3, seed=2, ancors="perimeter")
+	on_boundary = np.any((positions == 0) | (positions == 100), axis=1)
+	assert np.all(on_boundary[is_ancor])
+
+'''
+	N = 10001 in 2D needs 101 x 101 cells, the empty ones are spread
+	instead of leaving the last rows empty
+'''
+def test_grid_spreads_empty_cells():
+	positions, _, _ = field_generator.generate_field(100, 10001, 10, 0.3, 2, seed=1, layout="grid", jitter=0)
+	cells = np.floor(positions / (100 / 101)).astype(int)
+	assert len(np.unique(cells, axis=0)) == 10001
+	per_row = np.bincount(cells[:, 0], minlength=101)
+	assert per_row.min() >= 99
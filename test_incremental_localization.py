@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+import trillateration_2D
+import trillateration_3D
+from incremental_localization import IncrementalLocalizer
+
+MODULES = {
+	2: (trillateration_2D, trillateration_2D.Point2D, trillateration_2D.Sensor2D),
+	3: (trillateration_3D, trillateration_3D.Point3D, trillateration_3D.Sensor3D),
+}
+
+'''
+	Applies [events] random add/remove/move events to [localizer],
+	calling [check] after each one. Returns the final ancor set.
+'''
+def random_events(localizer, d, L, R, events, check = None):
+	_, point, sensor = MODULES[d]
+	spare = []
+	for _ in range(events):
+		event = np.random.randint(3)
+		if event == 0 or len(localizer.ancors) < 2:
+			ancor = spare.pop() if spare else sensor(None, R, True)
+			ancor.location = point(*(L * np.random.rand(d)))
+			localizer.add_ancor(ancor)
+		elif event == 1:
+			ancor = list(localizer.ancors)[np.random.randint(len(localizer.ancors))]
+			localizer.remove_ancor(ancor)
+			spare.append(ancor)
+		else:
+			ancor = list(localizer.ancors)[np.random.randint(len(localizer.ancors))]
+			localizer.move_ancor(ancor, point(*(L * np.random.rand(d))))
+
+		if check:
+			check(localizer)
+
+	return list(localizer.ancors)
+
+'''
+	No unlocalized sensor can be solved from its current candidates
+'''
+def assert_settled(localizer):
+	for sensor in localizer.non_ancors:
+		chosen = localizer._select(sensor)
+		if sensor.estimated_location or not chosen:
+			continue
+
+		shapes = [localizer.shape(ref.location, localizer.candidates[sensor][ref]) for ref in chosen]
+		assert not localizer.module.trilaterate_with_noise(*shapes), sensor
+
+def estimates(sensors):
+	return [s.estimated_location.as_numpy() if s.estimated_location else None for s in sensors]
+
+def assert_same(estimated, expected, sensors):
+	for sensor, a, b in zip(sensors, estimated, expected):
+		assert (a is None) == (b is None), sensor
+		if a is not None:
+			assert np.allclose(a, b, atol=1e-6), sensor
+
+'''
+	After any event sequence the noniterative localizer matches a
+	fresh one over the final ancors with the same ranges
+'''
+@pytest.mark.parametrize("d", [2, 3])
+@pytest.mark.parametrize("seed", range(5))
+def test_events_match_fresh_localizer(d, seed):
+	np.random.seed(seed)
+	module = MODULES[d][0]
+	L, R = (200, 80) if d == 2 else (120, 70)
+	ancors, non_ancors = module.generate_sensors(L, 200, R, 0.3)
+	localizer = IncrementalLocalizer(ancors, non_ancors, 0.5, d)
+	final = random_events(localizer, d, L, R, 60, assert_settled)
+	incremental = estimates(non_ancors)
+
+	IncrementalLocalizer(final, non_ancors, 0.5, d, ranges=localizer.ranges)
+	assert_same(incremental, estimates(non_ancors), non_ancors)
+
+'''
+	Iterative results depend on the solving order, without noise
+	every localizable sensor still lands on its true location
+'''
+@pytest.mark.parametrize("heuristic", ["distance", "degree"])
+@pytest.mark.parametrize("seed", range(3))
+def test_iterative_events_match_fresh_localizer(heuristic, seed):
+	np.random.seed(seed)
+	module = MODULES[2][0]
+	ancors, non_ancors = module.generate_sensors(200, 150, 60, 0.2)
+	localizer = IncrementalLocalizer(ancors, non_ancors, 0.0, 2, True, heuristic)
+	final = random_events(localizer, 2, 200, 60, 40)
+	incremental = estimates(non_ancors)
+
+	IncrementalLocalizer(final, non_ancors, 0.0, 2, True, heuristic)
+	assert_same(incremental, estimates(non_ancors), non_ancors)
+
+'''
+	With noise the iterative results depend on the solving order,
+	but no event may leave a solvable sensor unlocalized
+'''
+@pytest.mark.parametrize("heuristic", ["distance", "degree"])
+@pytest.mark.parametrize("seed", [29] + list(range(5)))
+def test_iterative_events_leave_nothing_solvable(heuristic, seed):
+	np.random.seed(seed)
+	module = MODULES[2][0]
+	ancors, non_ancors = module.generate_sensors(200, 150, 60, 0.2)
+	localizer = IncrementalLocalizer(ancors, non_ancors, 0.3, 2, True, heuristic)
+	assert_settled(localizer)
+	random_events(localizer, 2, 200, 60, 40, assert_settled)
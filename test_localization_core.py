@@ -0,0 +1,106 @@
+import copy
+import numpy as np
+import pytest
+import trillateration_2D
+import trillateration_3D
+import localization_core
+
+MODULES = {
+	2: (trillateration_2D, trillateration_2D.Circle),
+	3: (trillateration_3D, trillateration_3D.Sphere),
+}
+
+'''
+	Noise free scalar loops of localize_sensors and
+	localize_sensors_iterative, one trilaterate_with_noise per sensor
+'''
+def scalar_localize(module, shape, d, ancors, non_ancors, iterative, heuristic):
+	new_ancors = list(ancors)
+	previous_len = None
+	while previous_len != len(new_ancors):
+		previous_len = len(new_ancors)
+		for sensor in [s for s in non_ancors if not s.estimated_location]:
+			distances = [(module.distance(sensor.location, ancor.location), ancor) for ancor in new_ancors]
+			distances = [(r, ancor) for r, ancor in distances if r <= sensor.radius]
+			if len(distances) < d + 1:
+				continue
+
+			if iterative and heuristic == "degree":
+				distances.sort(key= lambda r: r[1].degree)
+			else:
+				distances.sort(key= lambda r: r[0])
+
+			result = module.trilaterate_with_noise(*[shape(ancor.location, r) for r, ancor in distances[:d + 1]])
+			if result:
+				sensor.estimated_location = result
+				if iterative:
+					sensor.degree = sum(ancor.degree for _, ancor in distances[:d + 1]) + 1
+					new_ancors.append(sensor)
+
+		if not iterative:
+			break
+
+	return [sensor for sensor in non_ancors if sensor.estimated_location]
+
+'''
+	Without noise the vectorized engine behind localize_sensors and
+	localize_sensors_iterative localizes the same sensors at the same
+	locations as the scalar loops
+'''
+@pytest.mark.parametrize("d", [2, 3])
+@pytest.mark.parametrize("iterative, heuristic", [(False, None), (True, "distance"), (True, "degree")])
+@pytest.mark.parametrize("seed", range(5))
+def test_noise_free_matches_scalar(d, iterative, heuristic, seed):
+	module, shape = MODULES[d]
+	np.random.seed(seed)
+	ancors, non_ancors = module.generate_sensors(200, 100, 60, 0.2)
+	expected_ancors, expected_non_ancors = copy.deepcopy((ancors, non_ancors))
+	expected = scalar_localize(module, shape, d, expected_ancors, expected_non_ancors, iterative, heuristic)
+
+	if iterative:
+		localized = module.localize_sensors_iterative(ancors, non_ancors, 0.0, heuristic)
+	else:
+		localized = module.localize_sensors(ancors, non_ancors, 0.0)
+
+	assert len(localized) > 0
+	assert sorted(non_ancors.index(s) for s in localized) == [expected_non_ancors.index(s) for s in expected]
+	for sensor, reference in zip(non_ancors, expected_non_ancors):
+		if sensor.estimated_location:
+			assert np.allclose(sensor.estimated_location.as_numpy(), reference.estimated_location.as_numpy(), atol=1e-6)
+
+'''
+	Without noise ransac puts every localized sensor on its true
+	location, also when one range of each sensor is corrupted
+'''
+@pytest.mark.parametrize("d", [2, 3])
+def test_ransac_noise_free(d):
+	np.random.seed(d)
+	rng = np.random.default_rng(d)
+	M, C = 2000, 8
+	truth = 1000 * rng.random((M, d))
+	centers = truth[:, None, :] + 100 * rng.uniform(-1, 1, (M, C, d))
+	ranges = np.linalg.norm(centers - truth[:, None, :], axis=2)
+	table = np.arange(M * C).reshape(M, C)
+	valid = np.ones((M, C), dtype=bool)
+	threshold = np.full((M, C), localization_core.CUTTOF_VAL)
+
+	estimates, localized, _ = localization_core.ransac(table, valid, centers.reshape(-1, d), ranges.ravel(), d + 1, threshold)
+	assert np.mean(localized) > 0.99
+	assert np.allclose(estimates[localized], truth[localized], rtol=0, atol=1e-6)
+
+	corrupted = ranges.copy()
+	corrupted[np.arange(M), rng.integers(C, size=M)] += 30
+	estimates, localized, _ = localization_core.ransac(table, valid, centers.reshape(-1, d), corrupted.ravel(), d + 1, threshold)
+	errors = np.linalg.norm(estimates[localized] - truth[localized], axis=1)
+	assert np.mean(localized) > 0.99
+	assert np.mean(errors < 1e-6) > 0.98
+
+@pytest.mark.parametrize("d", [2, 3])
+def test_ransac_solver_noise_free(d):
+	module = MODULES[d][0]
+	np.random.seed(d)
+	ancors, non_ancors = module.generate_sensors(200, 200, 80, 0.4)
+	localized = module.localize_sensors(ancors, non_ancors, 0.0, "ransac")
+	assert len(localized) > 0
+	for sensor in localized:
+		assert np.allclose(sensor.estimated_location.as_numpy(), sensor.location.as_numpy(), atol=1e-6)
@@ -0,0 +1,73 @@
+import copy
+import numpy as np
+import pytest
+import field_generator
+import trillateration_2D
+import trillateration_3D
+from measurements import RangeTable, simulate_ranges
+
+MODULES = {2: trillateration_2D, 3: trillateration_3D}
+
+def test_csr_round_trip():
+	positions, radii, is_ancor = field_generator.generate_field(200, 2000, 20, 0.2, 2, seed=4)
+	np.random.seed(0)
+	table = simulate_ranges(positions, radii, is_ancor, 0.1)
+	indptr, indices, ranges = table.to_csr()
+	assert len(indptr) == table.n_nodes + 1
+	assert indptr[-1] == len(table)
+
+	restored = RangeTable.from_csr(indptr, indices, ranges)
+	assert restored.n_nodes == table.n_nodes
+	original = sorted(zip(table.sensors.tolist(), table.ancors.tolist(), table.ranges.tolist()))
+	assert sorted(zip(restored.sensors.tolist(), restored.ancors.tolist(), restored.ranges.tolist())) == original
+
+'''
+	Simulated ranges follow the noise rules of the scalar localizers
+'''
+@pytest.mark.parametrize("iterative", [False, True])
+def test_simulated_noise_bounds(iterative):
+	positions, radii, is_ancor = field_generator.generate_field(200, 2000, 20, 0.2, 2, seed=4, radius_spread=0.5)
+	np.random.seed(0)
+	table = simulate_ranges(positions, radii, is_ancor, 0.3, iterative)
+	distances = np.linalg.norm(positions[table.sensors] - positions[table.ancors], axis=1)
+	scale = radii[table.sensors] if iterative else radii[table.ancors]
+	assert np.all(np.abs(table.ranges - distances) <= 0.3 * scale + 1e-9)
+	assert np.all(~is_ancor[table.sensors])
+	if iterative:
+		assert np.all(table.ranges <= radii[table.sensors])
+		assert np.all(table.sensors != table.ancors)
+	else:
+		assert np.all(is_ancor[table.ancors])
+		assert np.all(distances <= radii[table.sensors])
+
+'''
+	With a RangeTable the localizers only read ancor locations, non
+	ancors without a location get the same estimates
+'''
+@pytest.mark.parametrize("d", [2, 3])
+@pytest.mark.parametrize("iterative", [False, True])
+def test_localize_without_sensor_locations(d, iterative):
+	module = MODULES[d]
+	np.random.seed(d)
+	ancors, non_ancors = module.generate_sensors(200, 200, 80, 0.3)
+	sensors = ancors + non_ancors
+	positions = np.array([s.location.as_numpy() for s in sensors])
+	radii = np.array([s.radius for s in sensors], dtype=np.float64)
+	is_ancor = np.arange(len(sensors)) < len(ancors)
+	table = simulate_ranges(positions, radii, is_ancor, 0.1, iterative)
+
+	blind = copy.deepcopy(non_ancors)
+	for sensor in blind:
+		sensor.location = None
+
+	if iterative:
+		expected = module.localize_sensors_iterative(ancors, non_ancors, 0.1, measurements=table)
+		localized = module.localize_sensors_iterative(ancors, blind, 0.1, measurements=table)
+	else:
+		expected = module.localize_sensors(ancors, non_ancors, 0.1, measurements=table)
+		localized = module.localize_sensors(ancors, blind, 0.1, measurements=table)
+
+	assert len(localized) == len(expected) > 0
+	for sensor, reference in zip(localized, expected):
+		assert blind.index(sensor) == non_ancors.index(reference)
+		assert np.allclose(sensor.estimated_location.as_numpy(), reference.estimated_location.as_numpy())
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from metrics import ErrorAccumulator, error_cdf, localization_errors, summarize
+
+def errors(seed, n = 5000):
+	rng = np.random.default_rng(seed)
+	errors = rng.exponential(5.0, n)
+	errors[rng.random(n) < 0.2] = np.nan
+	return errors
+
+def test_localization_errors():
+	truth = np.array([[0.0, 0.0], [1.0, 1.0]])
+	estimates = np.array([[3.0, 4.0], [np.nan, np.nan]])
+	result = localization_errors(truth, estimates)
+	assert result[0] == 5.0
+	assert np.isnan(result[1])
+
+def test_summarize_nothing_localized():
+	summary = summarize(np.full(4, np.nan))
+	assert summary["localized"] == 0
+	assert summary["ale"] is None
+	assert summary["rmse"] is None
+
+'''
+	Chunks merged into one accumulator give the statistics of the
+	whole error vector, percentiles to within one bin
+'''
+def test_merged_accumulator_matches_summarize():
+	chunks = [errors(seed) for seed in range(4)]
+	everything = np.concatenate(chunks)
+	expected = summarize(everything)
+
+	accumulator = ErrorAccumulator(100.0)
+	for chunk in chunks:
+		accumulator.merge(ErrorAccumulator(100.0).update(chunk))
+
+	summary = accumulator.summary()
+	assert summary["total"] == expected["total"]
+	assert summary["localized"] == expected["localized"]
+	assert summary["ale"] == pytest.approx(expected["ale"])
+	assert summary["rmse"] == pytest.approx(expected["rmse"])
+	assert summary["max"] == expected["max"]
+
+	width = 100.0 / 1000
+	for p, value in expected["percentiles"].items():
+		assert abs(summary["percentiles"][p] - value) <= width
+
+def test_accumulator_cdf_matches_error_cdf():
+	values = errors(7)
+	edges, cdf = ErrorAccumulator(100.0, 200).update(values).cdf()
+	assert np.allclose(cdf, error_cdf(values, edges))
+
+def test_accumulator_overflow_percentile():
+	accumulator = ErrorAccumulator(10.0).update([1.0, 2.0, 50.0])
+	assert accumulator.percentile(100) == 50.0
+	assert accumulator.max == 50.0
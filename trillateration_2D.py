@@ -1,10 +1,9 @@
 import numpy as np
-import matplotlib.pyplot as plt
+import localization_core
+from batched_trilateration import CUTTOF_VAL
 
 np.random.seed(42)
 
-CUTTOF_VAL =.00001
-
 '''
 	2-dimensional point container class
 	Contains x and y coordinate
@@ -86,28 +85,42 @@ def distance(point1, point2):
 	must all itersect somewhere whith each other
 '''
 def trilaterate_with_noise(c1, c2, c3):
-	points = []
-	int1 = get_two_circle_intersections(c1, c2)
-	int2 = get_two_circle_intersections(c2, c3)
-	int3 = get_two_circle_intersections(c1, c3)
-	if int1 and int2 and int3:
-		points.extend(int1)
-		points.extend(int2)
-		points.extend(int3)
-	else:
-		return None
+	result, _ = trilaterate_with_residuals(c1, c2, c3)
+	return result
 
+'''
+	Same as trilaterate_with_noise but also returns the residuals
+	(distance to center minus radius) of the estimate for each circle.
+	Stops at the first pair of circles that does not intersect and
+	measures each candidate point's distances only once for both the
+	in-circles and on-circles checks.
+	Returns (None, None) if the circles can not be trilaterated.
+'''
+def trilaterate_with_residuals(c1, c2, c3):
 	circles = [c1, c2, c3]
-	points = [point for point in points if point_in_circles(point, circles)]
-	if len(points) > 0:
-		for point in points:
-			if point_on_circles(point, circles):
-				return point
-
-		result = get_polygon_centroid(points)
-		return result
-	else:
-		return None
+	points = []
+	for a, b in [(c1, c2), (c2, c3), (c1, c3)]:
+		intersections = get_two_circle_intersections(a, b)
+		if not intersections:
+			return None, None
+
+		points.extend(intersections)
+
+	centers = np.array([c.center.as_numpy() for c in circles])
+	radii = np.array([c.radius for c in circles])
+	coords = np.array([point.as_numpy() for point in points])
+	residuals = np.linalg.norm(coords[:, None, :] - centers[None, :, :], axis=2) - radii
+	inside = np.all(residuals <= CUTTOF_VAL, axis=1)
+	if not np.any(inside):
+		return None, None
+
+	on = inside & np.all(np.abs(residuals) <= CUTTOF_VAL, axis=1)
+	if np.any(on):
+		first = np.argmax(on)
+		return points[first], residuals[first]
+
+	result = get_polygon_centroid([point for point, keep in zip(points, inside) if keep])
+	return result, np.linalg.norm(result.as_numpy() - centers, axis=1) - radii
 
 '''
 	Check is a point is contained in a list of Cicle objects
@@ -197,8 +210,8 @@ def generate_sensors(L, N, R, Fa):
 	ancor_count = int(N * Fa)
 	ancor_sensors = []
 	nancor_sensors = []
-	for i in range(N):
-		x, y = L * np.random.rand(2)
+	locations = L * np.random.rand(N, 2)
+	for i, (x, y) in enumerate(locations):
 		if i < ancor_count:
 			sensor = Sensor2D(Point2D(x, y), R, True)
 			ancor_sensors.append(sensor)
@@ -225,58 +238,25 @@ def add_noise(d, noise_scale):
 '''
 	Noniterative Localizaztion algorithm usin 2D trilateration.
 	Localizes all non_ancors sensors if possible
+	[solver] selects how ancors are used {"nearest", "ransac"}
+	[precision] selects the compute precision {"float64", "float32"}
+	[measurements] optional measurements.RangeTable of measured ranges,
+	nodes indexed as ancors followed by non_ancors. Without it ranges
+	are simulated from the true locations.
 '''
-def localize_sensors(ancors, non_ancors, Ferr):
-	localized = []
-	for sensor in non_ancors:
-		circles = [Circle(ancor.location, add_noise(distance(sensor.location, ancor.location), ancor.radius * Ferr)) for ancor in ancors if distance(sensor.location, ancor.location) <= sensor.radius]
-		if len(circles) >= 3:
-			circles.sort(key=lambda c: c.radius)
-			c1, c2, c3 = circles[:3]
-			result = trilaterate_with_noise(c1, c2, c3)
-			if result:
-				sensor.estimated_location = result
-				localized.append(sensor)
-
-	return localized
+def localize_sensors(ancors, non_ancors, Ferr, solver = "nearest", precision = "float64", measurements = None):
+	return localization_core.localize_sensor_objects(ancors, non_ancors, Ferr, Point2D, solver=solver, precision=precision, measurements=measurements)
 
 '''
 	Iterative Localizaztion algorithm usin 2D trilateration.
 	Localizes all non_ancors sensors if possible
 	[heuristic] parameter determines which heuristic is used {"degree", "distance"}
+	[solver] selects how ancors are used {"nearest", "ransac"}
+	[precision] selects the compute precision {"float64", "float32"}
+	[measurements] optional measurements.RangeTable, see localize_sensors
 '''
-def localize_sensors_iterative(ancors, non_ancors, Ferr, heuristic = "distance"):
-	new_ancors = ancors.copy()
-	unlocalized = non_ancors.copy()
-	previous_len = 0
-	while previous_len != len(new_ancors):
-		previous_len = len(new_ancors)
-		for sensor in [sen for sen in unlocalized if not sen.is_ancor]:
-			distances = []
-			for ancor in new_ancors:
-				d = add_noise(distance(sensor.location, ancor.location), Ferr * sensor.radius)
-				if d <= sensor.radius:
-					distances.append((d, ancor))
-
-			if len(distances) < 3:
-				continue
-
-			if heuristic == "degree":
-				distances.sort(key= lambda d: d[1].degree)
-			else:
-				distances.sort(key= lambda d: d[0])
-
-			c1, c2, c3 = [Circle(dist[1].location, dist[0]) for dist in distances[:3]][:3]
-			result = trilaterate_with_noise(c1, c2, c3)
-			if result:
-				sensor.estimated_location = result
-				sensor.degree = distances[0][1].degree + distances[1][1].degree + distances[2][1].degree + 1
-				new_ancors.append(sensor)
-
-		unlocalized = [sensor for sensor in non_ancors if not sensor.estimated_location]
-
-	localized = [sensor for sensor in new_ancors if not sensor.is_ancor and sensor.estimated_location]
-	return localized
+def localize_sensors_iterative(ancors, non_ancors, Ferr, heuristic = "distance", solver = "nearest", precision = "float64", measurements = None):
+	return localization_core.localize_sensor_objects(ancors, non_ancors, Ferr, Point2D, True, heuristic, solver, precision, measurements)
 
 if __name__ == '__main__':
 	L = 200
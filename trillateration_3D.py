@@ -1,12 +1,11 @@
 import numpy as np
-import matplotlib.pyplot as plt
+import localization_core
+from batched_trilateration import CUTTOF_VAL
 import intersect_spheres
 from intersect_spheres import SphereOperations
 
 np.random.seed(42)
 
-CUTTOF_VAL =.00001
-
 '''
 	3-dimensional point container class
 	Contains x, y and z coordinate
@@ -18,7 +17,7 @@ class Point3D:
 		self.z = z
 
 	def __repr__(self):
-		return f"Point3D [{self.x}, {self.y}, {self.y}]"
+		return f"Point3D [{self.x}, {self.y}, {self.z}]"
 
 	def as_numpy(self):
 		return np.array([self.x, self.y, self.z])
@@ -91,30 +90,42 @@ def distance(point1, point2):
 	must all itersect somewhere whith each other
 '''
 def trilaterate_with_noise(s1, s2, s3, s4):
-	points = []
-	int1 = get_three_spheres_intersections(s1, s2, s3)
-	int2 = get_three_spheres_intersections(s1, s2, s4)
-	int3 = get_three_spheres_intersections(s1, s3, s4)
-	int4 = get_three_spheres_intersections(s2, s3, s4)
-	if int1 and int2 and int3 and int4:
-		points.extend(int1)
-		points.extend(int2)
-		points.extend(int3)
-		points.extend(int4)
-	else:
-		return None
+	result, _ = trilaterate_with_residuals(s1, s2, s3, s4)
+	return result
 
+'''
+	Same as trilaterate_with_noise but also returns the residuals
+	(distance to center minus radius) of the estimate for each sphere.
+	Stops at the first triple of spheres that does not intersect and
+	measures each candidate point's distances only once for both the
+	in-spheres and on-spheres checks.
+	Returns (None, None) if the spheres can not be trilaterated.
+'''
+def trilaterate_with_residuals(s1, s2, s3, s4):
 	spheres = [s1, s2, s3, s4]
-	points = [point for point in points if point_in_spheres(point, spheres)]
-	if len(points) > 0:
-		for point in points:
-			if point_on_spheres(point, spheres):
-				return point
-
-		result = get_polygon_centroid(points)
-		return result
-	else:
-		return None
+	points = []
+	for a, b, c in [(s1, s2, s3), (s1, s2, s4), (s1, s3, s4), (s2, s3, s4)]:
+		intersections = get_three_spheres_intersections(a, b, c)
+		if not intersections:
+			return None, None
+
+		points.extend(intersections)
+
+	centers = np.array([s.center.as_numpy() for s in spheres])
+	radii = np.array([s.radius for s in spheres])
+	coords = np.array([point.as_numpy() for point in points])
+	residuals = np.linalg.norm(coords[:, None, :] - centers[None, :, :], axis=2) - radii
+	inside = np.all(residuals <= CUTTOF_VAL, axis=1)
+	if not np.any(inside):
+		return None, None
+
+	on = inside & np.all(np.abs(residuals) <= CUTTOF_VAL, axis=1)
+	if np.any(on):
+		first = np.argmax(on)
+		return points[first], residuals[first]
+
+	result = get_polygon_centroid([point for point, keep in zip(points, inside) if keep])
+	return result, np.linalg.norm(result.as_numpy() - centers, axis=1) - radii
 
 '''
 	Check is a point is contained in a list of Sphere objects
@@ -191,8 +202,8 @@ def generate_sensors(L, N, R, Fa):
 	ancor_count = int(N * Fa)
 	ancor_sensors = []
 	nancor_sensors = []
-	for i in range(N):
-		x, y, z = L * np.random.rand(3)
+	locations = L * np.random.rand(N, 3)
+	for i, (x, y, z) in enumerate(locations):
 		if i < ancor_count:
 			sensor = Sensor3D(Point3D(x, y, z), R, True)
 			ancor_sensors.append(sensor)
@@ -217,60 +228,27 @@ def add_noise(d, noise_scale):
 		return d + noise
 
 '''
-	Noniterative Localizaztion algorithm usin 2D trilateration.
+	Noniterative Localizaztion algorithm usin 3D trilateration.
 	Localizes all non_ancors sensors if possible
+	[solver] selects how ancors are used {"nearest", "ransac"}
+	[precision] selects the compute precision {"float64", "float32"}
+	[measurements] optional measurements.RangeTable of measured ranges,
+	nodes indexed as ancors followed by non_ancors. Without it ranges
+	are simulated from the true locations.
 '''
-def localize_sensors(ancors, non_ancors, Ferr):
-	localized = []
-	for sensor in non_ancors:
-		spheres = [Sphere(ancor.location, add_noise(distance(sensor.location, ancor.location), ancor.radius * Ferr)) for ancor in ancors if distance(sensor.location, ancor.location) <= sensor.radius]
-		if len(spheres) >= 4:
-			spheres.sort(key=lambda s: s.radius)
-			s1, s2, s3, s4 = spheres[:4]
-			result = trilaterate_with_noise(s1, s2, s3, s4)
-			if result:
-				sensor.estimated_location = result
-				localized.append(sensor)
-
-	return localized
+def localize_sensors(ancors, non_ancors, Ferr, solver = "nearest", precision = "float64", measurements = None):
+	return localization_core.localize_sensor_objects(ancors, non_ancors, Ferr, Point3D, solver=solver, precision=precision, measurements=measurements)
 
 '''
-	Iterative Localizaztion algorithm usin 2D trilateration.
+	Iterative Localizaztion algorithm usin 3D trilateration.
 	Localizes all non_ancors sensors if possible
 	[heuristic] parameter determines which heuristic is used {"degree", "distance"}
+	[solver] selects how ancors are used {"nearest", "ransac"}
+	[precision] selects the compute precision {"float64", "float32"}
+	[measurements] optional measurements.RangeTable, see localize_sensors
 '''
-def localize_sensors_iterative(ancors, non_ancors, Ferr, heuristic = "distance"):
-	new_ancors = ancors.copy()
-	unlocalized = non_ancors.copy()
-	previous_len = 0
-	while previous_len != len(new_ancors):
-		previous_len = len(new_ancors)
-		for sensor in [sen for sen in unlocalized if not sen.is_ancor]:
-			distances = []
-			for ancor in new_ancors:
-				d = add_noise(distance(sensor.location, ancor.location), Ferr * sensor.radius)
-				if d <= sensor.radius:
-					distances.append((d, ancor))
-
-			if len(distances) < 4:
-				continue
-
-			if heuristic == "degree":
-				distances.sort(key= lambda d: d[1].degree)
-			else:
-				distances.sort(key= lambda d: d[0])
-
-			s1, s2, s3, s4 = [Sphere(dist[1].location, dist[0]) for dist in distances[:4]][:4]
-			result = trilaterate_with_noise(s1, s2, s3, s4)
-			if result:
-				sensor.estimated_location = result
-				sensor.degree = distances[0][1].degree + distances[1][1].degree + distances[2][1].degree + distances[3][1].degree + 1
-				new_ancors.append(sensor)
-
-		unlocalized = [sensor for sensor in non_ancors if not sensor.estimated_location]
-
-	localized = [sensor for sensor in new_ancors if not sensor.is_ancor and sensor.estimated_location]
-	return localized
+def localize_sensors_iterative(ancors, non_ancors, Ferr, heuristic = "distance", solver = "nearest", precision = "float64", measurements = None):
+	return localization_core.localize_sensor_objects(ancors, non_ancors, Ferr, Point3D, True, heuristic, solver, precision, measurements)
 
 if __name__ == '__main__':
 	L = 200